@@ -1,8 +1,12 @@
 import numpy as np
-from numba import jit
+from numba import jit, prange
 
-@jit(nopython=True, fastmath=True, cache=True)
-def relax2d(ax, ay, cx, cy, b, d_rhs, n, m, U_initial, omega=1.8, eps=1e-13, max_iter=10_000):
+# Tile sizes for the blocked sweep in relax3d (k is the contiguous axis)
+BI, BJ, BK = 16, 16, 64
+
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def relax2d(ax, ay, cx, cy, b, d_rhs, n, m, U_initial, omega=1.8, eps=1e-13, max_iter=10_000,
+            check_every=16):
     """
     Successive Over-Relaxation (SOR) solver for a 2D discrete linear system.
 
@@ -31,6 +35,8 @@ def relax2d(ax, ay, cx, cy, b, d_rhs, n, m, U_initial, omega=1.8, eps=1e-13, max
         Maximum allowed iterations.
     min_iter : int
         Minimum number of iterations (useful for smoothing in multigrid).
+    check_every : int
+        Number of sweeps between convergence checks.
 
     Returns
     -------
@@ -44,31 +50,28 @@ def relax2d(ax, ay, cx, cy, b, d_rhs, n, m, U_initial, omega=1.8, eps=1e-13, max
     inv_b = np.zeros_like(b)
     inv_b[1:-1, 1:-1] = 1.0 / b[1:-1, 1:-1]
 
-    U_old = U.copy()
-    
     while err > eps and it < max_iter or it < 100:
         it += 1
-        
-        for i in range(n):
-            for j in range(m):
-                U_old[i, j] = U[i, j]
-
-        # Interior nodes (i=1..n-2, j=1..m-2)
-        for i in range(1, n - 1):
-            for j in range(1, m - 1):
-                t = (ax[i, j] * U[i - 1, j] + cx[i, j] * U[i + 1, j] +
-                     ay[i, j] * U[i, j - 1] + cy[i, j] * U[i, j + 1] -
-                     d_rhs[i, j]) * inv_b[i, j]
-                
-
-                U[i, j] = t * omega + U[i, j] * (1 - omega)
-
-        err = 0.0
-        for i in range(1, n-1):
-            for j in range(1, m-1):
-                diff = abs(U[i, j] - U_old[i, j])
-                if diff > err:
-                    err = diff
+        # Also measure on the sweeps whose error is printed below
+        check = it % check_every == 0 or it % 500 == 0
+        if check:
+            err = 0.0
+
+        # Interior nodes (i=1..n-2, j=1..m-2), red-black ordering:
+        # nodes of one colour only read nodes of the other colour.
+        for color in range(2):
+            for i in prange(1, n - 1):
+                j0 = 1 + ((i + color) & 1)
+                for j in range(j0, m - 1, 2):
+                    t = (ax[i, j] * U[i - 1, j] + cx[i, j] * U[i + 1, j] +
+                         ay[i, j] * U[i, j - 1] + cy[i, j] * U[i, j + 1] -
+                         d_rhs[i, j]) * inv_b[i, j]
+
+                    # Size of the update, max-norm over the sweep
+                    if check:
+                        err = max(err, omega * abs(t - U[i, j]))
+                    U[i, j] = t * omega + U[i, j] * (1 - omega)
+
         if it % 500 == 0:
             print("iter=", it, "err=", err)
 
@@ -81,8 +84,9 @@ def relax2d(ax, ay, cx, cy, b, d_rhs, n, m, U_initial, omega=1.8, eps=1e-13, max
     return U
 
 
-@jit(nopython=True, fastmath=True, cache=True)
-def relax3d(ax, ay, az, cx, cy, cz, b, d_rhs, nx, ny, nz, U_initial, omega=1.8, eps=1e-13, max_iter=10000, min_iter=100):
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def relax3d(ax, ay, az, cx, cy, cz, b, d_rhs, nx, ny, nz, U_initial, omega=1.8, eps=1e-13, max_iter=10000, min_iter=100,
+            check_every=16):
     """
     Successive Over-Relaxation (SOR) solver for a 3D discrete linear system.
 
@@ -114,6 +118,8 @@ def relax3d(ax, ay, az, cx, cy, cz, b, d_rhs, nx, ny, nz, U_initial, omega=1.8,
         Hard iteration limit.
     min_iter : int
         Minimum number of smoothing iterations.
+    check_every : int
+        Number of sweeps between convergence checks.
 
     Returns
     -------
@@ -121,38 +127,41 @@ def relax3d(ax, ay, az, cx, cy, cz, b, d_rhs, nx, ny, nz, U_initial, omega=1.8,
         Relaxed solution field.
     """
     U = U_initial.copy()
-    U_old = U.copy()
 
     inv_b = np.zeros_like(b)
     inv_b[1:-1, 1:-1, 1:-1] = 1.0 / b[1:-1, 1:-1, 1:-1]
+    n_bi = (nx - 2 + BI - 1) // BI
+    n_bj = (ny - 2 + BJ - 1) // BJ
 
     err = 1.0
     it = 0
 
     while ((err > eps and it < max_iter) or it < min_iter):
         it += 1
-
-        for i in range(nx):
-            for j in range(ny):
-                for k in range(nz):
-                    U_old[i, j, k] = U[i, j, k]
-
-        for i in range(1, nx - 1):
-            for j in range(1, ny - 1):
-                for k in range(1, nz - 1):
-                    t = ( ax[i,j,k]*U[i-1,j,k] + cx[i,j,k]*U[i+1,j,k]
-                        + ay[i,j,k]*U[i,j-1,k] + cy[i,j,k]*U[i,j+1,k]
-                        + az[i,j,k]*U[i,j,k-1] + cz[i,j,k]*U[i,j,k+1]
-                        - d_rhs[i,j,k]) * inv_b[i,j,k]
-                    U[i,j,k] = omega*t + (1.0 - omega)*U[i,j,k]
-
-        err = 0.0
-        for i in range(1, nx-1):
-            for j in range(1, ny-1):
-                for k in range(1, nz-1):
-                    diff = abs(U[i,j,k] - U_old[i,j,k])
-                    if diff > err:
-                        err = diff
+        # Also measure on the sweeps whose error is printed below
+        check = it % check_every == 0 or it % 500 == 0
+        if check:
+            err = 0.0
+
+        # Red-black ordering on (i + j + k) parity, swept in BI x BJ x BK tiles
+        # so neighbouring planes of U stay in cache. The (i, j) tiles are
+        # flattened into one prange so small nx still feeds every thread.
+        for color in range(2):
+            for tile in prange(n_bi * n_bj):
+                ii = 1 + (tile // n_bj) * BI
+                jj = 1 + (tile % n_bj) * BJ
+                for kk in range(1, nz - 1, BK):
+                    for i in range(ii, min(ii + BI, nx - 1)):
+                        for j in range(jj, min(jj + BJ, ny - 1)):
+                            k0 = kk + ((1 + i + j + color - kk) & 1)
+                            for k in range(k0, min(kk + BK, nz - 1), 2):
+                                t = ( ax[i,j,k]*U[i-1,j,k] + cx[i,j,k]*U[i+1,j,k]
+                                    + ay[i,j,k]*U[i,j-1,k] + cy[i,j,k]*U[i,j+1,k]
+                                    + az[i,j,k]*U[i,j,k-1] + cz[i,j,k]*U[i,j,k+1]
+                                    - d_rhs[i,j,k]) * inv_b[i,j,k]
+                                if check:
+                                    err = max(err, omega*abs(t - U[i,j,k]))
+                                U[i,j,k] = omega*t + (1.0 - omega)*U[i,j,k]
 
         if it % 500 == 0:
             print("iter=", it, "err=", err)
@@ -166,7 +175,56 @@ def relax3d(ax, ay, az, cx, cy, cz, b, d_rhs, nx, ny, nz, U_initial, omega=1.8,
 
 
 @jit(nopython=True, fastmath=True, cache=True)
-def thomas(a, b, c, d):
+def thomas_factor(a, b, c, inv_m):
+    """
+    LU factorization of a tridiagonal matrix for the Thomas algorithm.
+
+    Parameters
+    ----------
+    a, b, c : 1D arrays
+        Sub-, main and super-diagonal coefficients (as in `thomas`).
+    inv_m : 1D array
+        Preallocated float64 array of length n that receives the factor.
+
+    Returns
+    -------
+    inv_m : 1D array
+        Reciprocals of the pivots m[i] = b[i] - a[i] * c[i-1] / m[i-1].
+        The upper factor's scaled super-diagonal is c[i] * inv_m[i].
+    """
+    n = len(b)
+
+    inv_m[0] = 1.0 / b[0]
+    for i in range(1, n):
+        inv_m[i] = 1.0 / (b[i] - a[i] * c[i - 1] * inv_m[i - 1])
+
+    return inv_m
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def thomas_solve(a, c, inv_m, d, out):
+    """
+    Solve A x = d with the factor from `thomas_factor`, writing x into `out`.
+
+    Neither the factor nor `d` are modified, so they can be reused for
+    any number of right-hand sides.
+    """
+    n = len(d)
+
+    # Forward substitution
+    out[0] = d[0] * inv_m[0]
+    for i in range(1, n):
+        out[i] = (d[i] - a[i] * out[i - 1]) * inv_m[i]
+
+    # Back substitution
+    for i in range(n - 2, -1, -1):
+        out[i] -= c[i] * inv_m[i] * out[i + 1]
+
+    return out
+
+
+@jit(nopython=True, fastmath=True, cache=True)
+def thomas(a, b, c, d, out, work=None):
     """
     Thomas algorithm for solving a tridiagonal linear system A x = d.
 
@@ -180,24 +238,33 @@ def thomas(a, b, c, d):
         Super-diagonal coefficients (c[-1] is unused or should be 0).
     d : 1D array
         Right-hand side vector.
+    out : 1D array
+        Preallocated float64 array of length n that receives the solution.
+    work : 1D array, optional
+        Float64 scratch array of length n for the factor.
+        Pass one in to make repeated calls allocation-free.
 
     Returns
     -------
-    y : 1D array
-        Solution vector.
+    out : 1D array
+        Solution vector. The inputs a, b, c, d are left unchanged.
     """
-    n = len(b)
+    if work is None:
+        work = np.empty(len(b))
+    thomas_factor(a, b, c, work)
+    return thomas_solve(a, c, work, d, out)
 
-    # Forward sweep
-    for i in range(1, n):
-        w = a[i] / b[i - 1]
-        b[i] = b[i] - w * c[i - 1]
-        d[i] = d[i] - w * d[i - 1]
 
-    # Back substitution
-    y = np.zeros(n)
-    y[-1] = d[-1] / b[-1]
-    for i in range(n - 2, -1, -1):
-        y[i] = (d[i] - c[i] * y[i + 1]) / b[i]
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def thomas_many(a, b, c, D, Out):
+    """
+    Solve A x = d for many right-hand sides sharing one tridiagonal matrix.
+
+    The matrix is factored once and the rows of D (shape (k, n)) are solved
+    in parallel into the matching rows of Out.
+    """
+    inv_m = thomas_factor(a, b, c, np.empty(len(b)))
+    for r in prange(D.shape[0]):
+        thomas_solve(a, c, inv_m, D[r], Out[r])
 
-    return y
\ No newline at end of file
+    return Out
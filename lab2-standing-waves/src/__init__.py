@@ -3,12 +3,23 @@
 from .config import get_config
 from .simulation import run_simulation
 from .visualization import create_2d_animation, create_3d_animation
-from .solver import relax
+from .solver import (build_levels, jacobi_radius, mirror_neumann, multigrid_work,
+                     pack_coeffs, relax, relax_multigrid, relax_uniform, split_overrides,
+                     vcycle)
 
 __all__ = [
     "get_config",
     "run_simulation",
     "create_2d_animation",
     "create_3d_animation",
-    "relax"
+    "build_levels",
+    "jacobi_radius",
+    "mirror_neumann",
+    "multigrid_work",
+    "pack_coeffs",
+    "relax",
+    "relax_multigrid",
+    "relax_uniform",
+    "split_overrides",
+    "vcycle"
 ]
@@ -13,9 +13,11 @@ def get_config(experiment_type: str) -> dict:
         "frequency_k": 4,    # Source temporal frequency multiplier (KK)
         "dt": 1e-2,
         "max_steps": 1000,
-        "relax_alfa": 1.8,
+        "relax_method": "sor",  # 'sor', 'multigrid' (V-cycles with SOR smoothing), 'cuda' or 'aot'
+        "relax_alfa": None,  # None: Chebyshev-accelerated SOR, else a fixed factor
         "relax_eps": 1e-13,
         "relax_max_iter": 5000,
+        "relax_check_every": 16,  # Sweeps between convergence checks
         "experiment_type": experiment_type,
         "light_k": 2,
         "ds": 2
@@ -0,0 +1,120 @@
+import numpy as np
+from numba import cuda, float64
+
+TPB = 16  # Threads per block along each axis
+
+@cuda.jit
+def relax_kernel_rb(U, coeffs, d_rhs, alfa, color, dev):
+    """
+    One red-black SOR half-sweep over the nodes with (i + j + color) odd.
+
+    Each block stages its (TPB + 2) x (TPB + 2) tile of U, halo included, in
+    shared memory. Nodes of one colour only read the other colour, which this
+    launch does not write, so the staged tile stays valid for the whole block.
+    The size of each update is stored in the flat array `dev`.
+    """
+    tile = cuda.shared.array((TPB + 2, TPB + 2), float64)
+    n, m = U.shape
+    ti, tj = cuda.threadIdx.x + 1, cuda.threadIdx.y + 1
+    i, j = cuda.grid(2)
+
+    if i < n and j < m:
+        tile[ti, tj] = U[i, j]
+        if ti == 1 and i > 0:
+            tile[0, tj] = U[i - 1, j]
+        if ti == TPB and i < n - 1:
+            tile[ti + 1, tj] = U[i + 1, j]
+        if tj == 1 and j > 0:
+            tile[ti, 0] = U[i, j - 1]
+        if tj == TPB and j < m - 1:
+            tile[ti, tj + 1] = U[i, j + 1]
+    cuda.syncthreads()
+
+    if 1 <= i < n - 1 and 1 <= j < m - 1 and (i + j + color) & 1 == 1:
+        t = (coeffs[i, j, 0] * tile[ti - 1, tj] + coeffs[i, j, 1] * tile[ti + 1, tj] +
+             coeffs[i, j, 2] * tile[ti, tj - 1] + coeffs[i, j, 3] * tile[ti, tj + 1] -
+             d_rhs[i, j]) * coeffs[i, j, 4]
+        dev[i * m + j] = abs(tile[ti, tj] - t)
+        U[i, j] = t * alfa + tile[ti, tj] * (1 - alfa)
+
+@cuda.jit
+def mirror_neumann_kernel(U):
+    """Device version of `solver.mirror_neumann`; one thread per edge position."""
+    n, m = U.shape
+    t = cuda.grid(1)
+    if 1 <= t < n - 1:
+        U[t, 0] = U[t, 1]
+        U[t, m - 1] = U[t, m - 2]
+    if 1 <= t < m - 1:
+        U[0, t] = U[1, t]
+        U[n - 1, t] = U[n - 2, t]
+    if t == 0:
+        U[0, 0] = U[1, 1]
+        U[0, m - 1] = U[1, m - 2]
+        U[n - 1, 0] = U[n - 2, 1]
+        U[n - 1, m - 1] = U[n - 2, m - 2]
+
+@cuda.jit
+def extrapolate_kernel(U, U0, U1):
+    """Initial guess U = 2 * U1 - U0 from the two previous time layers."""
+    i, j = cuda.grid(2)
+    if i < U.shape[0] and j < U.shape[1]:
+        U[i, j] = 2.0 * U1[i, j] - U0[i, j]
+
+@cuda.reduce
+def max_reduce(a, b):
+    return max(a, b)
+
+def _on_device(a):
+    """Return `a` if it already lives on the GPU, else a device copy of it."""
+    return cuda.to_device(a) if isinstance(a, np.ndarray) else a
+
+def _grid(n, m):
+    """Launch configuration covering an n x m array with TPB x TPB blocks."""
+    return ((n + TPB - 1) // TPB, (m + TPB - 1) // TPB), (TPB, TPB)
+
+def extrapolate_cuda(U, U0, U1):
+    """Fill the device array U with 2 * U1 - U0 without leaving the GPU."""
+    blockspergrid, threadsperblock = _grid(*U.shape)
+    extrapolate_kernel[blockspergrid, threadsperblock](U, U0, U1)
+
+def relax_cuda(coeffs, d_rhs, U, alfa=1.8, eps=1e-13, max_iter=10_000, check_every=16,
+               neumann=False, dev=None):
+    """
+    Red-black SOR on the GPU; same arguments and stopping rule as `relax`.
+    With `neumann` the edges are mirrored on the device after the solve.
+
+    Arrays may be given on the host or already on the device. `U` is the
+    initial guess and is relaxed in place: a device `U` stays on the device,
+    a host `U` receives the result. Returns the number of sweeps performed.
+
+    `dev` is the device scratch array of n * m update sizes. It must start
+    zeroed (edge entries are never written); pass one to reuse it across calls.
+    """
+    n, m = U.shape
+    d_U, d_coeffs, d_d_rhs = _on_device(U), _on_device(coeffs), _on_device(d_rhs)
+    if dev is None:
+        dev = cuda.to_device(np.zeros(n * m))
+
+    blockspergrid, threadsperblock = _grid(n, m)
+
+    err = 1.0
+    it = 0
+    while err > eps and it < max_iter:
+        it += 1
+        for color in range(2):
+            relax_kernel_rb[blockspergrid, threadsperblock](d_U, d_coeffs, d_d_rhs,
+                                                            alfa, color, dev)
+        if it % check_every == 0:
+            err = max_reduce(dev)
+
+    if it >= max_iter:
+        print(f"Warning: Relaxation method did not converge in {max_iter} iterations. Final error: {err}")
+
+    if neumann:
+        edge = max(n, m)
+        mirror_neumann_kernel[(edge + TPB - 1) // TPB, TPB](d_U)
+
+    if d_U is not U:
+        d_U.copy_to_host(U)
+    return it
@@ -0,0 +1,61 @@
+"""
+Ahead-of-time build of the SOR solver for the default 101 x 101 grid.
+
+Run once from `lab2-standing-waves`:
+
+    python -m src.relax_aot
+
+This writes the extension module `relax_mod` next to this file. It is only
+used when the config sets `relax_method='aot'`, which requires a 101 x 101
+grid and the built module; there is no fallback to the JIT-compiled
+`relax_uniform`. The default `relax_method='sor'` never imports it.
+"""
+import os
+
+from numba.pycc import CC
+
+from .solver import _chebyshev_omega, _sor_row, mirror_neumann
+
+# Grid shape burned into the compiled module
+N, M = 101, 101
+
+cc = CC('relax_mod')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+@cc.export('relax_101x101',
+           'i8(f8[:], i8[:], i8[:], f8[:, :], f8[:, :], f8[:, :], f8, f8, i8, i8, f8, b1)')
+def relax_101x101(base, row_ptr, ov_j, ov_coeffs, d_rhs, U,
+                  alfa, eps, max_iter, check_every, rho, neumann):
+    """
+    `relax_uniform` for an N x M grid, with the same arguments apart from n, m.
+
+    Compiled modules cannot use `prange`, so the rows are swept serially.
+    """
+    omega = 1.0 if rho > 0.0 else alfa
+    err = 1.0
+    it = 0
+
+    while err > eps and it < max_iter:
+        it += 1
+        check = it % check_every == 0
+        if check:
+            err = 0.0
+        for color in range(2):
+            for i in range(1, N - 1):
+                dev = _sor_row(U, d_rhs, i, color, M, base, row_ptr, ov_j, ov_coeffs,
+                               omega, check)
+                if check:
+                    err = max(err, dev)
+            if rho > 0.0:
+                omega = _chebyshev_omega(omega, rho, it == 1 and color == 0)
+
+    if it >= max_iter:
+        # Compiled modules cannot box floats for print, so the error is left out
+        print("Warning: Relaxation method did not converge in", max_iter, "iterations.")
+
+    if neumann:
+        mirror_neumann(U)
+    return it
+
+if __name__ == "__main__":
+    cc.compile()
@@ -1,10 +1,12 @@
 import numpy as np
+from numba import jit, prange
 from tqdm import tqdm
-from .solver import relax
+from .solver import (build_levels, jacobi_radius, multigrid_work, pack_coeffs,
+                     relax_multigrid, relax_uniform, split_overrides)
 
 # --- Helper functions for boundary conditions ---
 
-def apply_neumann_coeff_mods(b, ax, ay, cx, cy, nx, ny):
+def apply_neumann_coeff_mods(b, inv_b, ax, ay, cx, cy, nx, ny):
     """Coefficient modifications for Neumann boundaries (free edges)."""
     b[:, 1] -= ay[:, 1]
     ay[:, 1] = 0.0
@@ -14,41 +16,43 @@ def apply_neumann_coeff_mods(b, ax, ay, cx, cy, nx, ny):
     ax[1, :] = 0.0
     b[nx - 2, :] -= cx[nx - 2, :]
     cx[nx - 2, :] = 0.0
-
-def copy_neumann_boundaries(U, nx, ny):
-    """Neumann copying (mirror extrapolation + corners)."""
-    U[:, 0] = U[:, 1]
-    U[:, ny - 1] = U[:, ny - 2]
-    U[0, :] = U[1, :]
-    U[nx - 1, :] = U[nx - 2, :]
-    U[0, 0] = 0.5 * (U[1, 0] + U[0, 1])
-    U[nx - 1, ny - 1] = 0.5 * (U[nx - 2, ny - 1] + U[nx - 1, ny - 2])
-    U[0, ny - 1] = 0.5 * (U[0, ny - 2] + U[1, ny - 1])
-    U[nx - 1, 0] = 0.5 * (U[nx - 1, 1] + U[nx - 2, 0])
-
-def set_sources(k, ax, ay, cx, cy, b, d_rhs, config):
-    """Set sources according to the experiment_type."""
+    # Only the modified rows/columns need a new reciprocal
+    inv_b[:, 1] = 1.0 / b[:, 1]
+    inv_b[:, ny - 2] = 1.0 / b[:, ny - 2]
+    inv_b[1, :] = 1.0 / b[1, :]
+    inv_b[nx - 2, :] = 1.0 / b[nx - 2, :]
+
+def source_nodes(config):
+    """Grid indices (I, J) of the source nodes for the experiment_type."""
     nx, ny = config['nx'], config['ny']
-    AA, KK, dt = config['amplitude'], config['frequency_k'], config['dt']
     experiment_type = config['experiment_type']
 
-    source_value = AA * np.sin(np.pi * KK * k * dt)
-
     if experiment_type in ('FREE_CENTER', 'CLAMPED_CENTER'):
-        I, J = nx // 2, ny // 2
-        ax[I, J], ay[I, J], cx[I, J], cy[I, J] = 0.0, 0.0, 0.0, 0.0
-        b[I, J] = 1.0
-        d_rhs[I, J] = source_value
+        return [(nx // 2, ny // 2)]
     elif experiment_type == 'FREE_TWO_GENERATORS':
-        I_left, I_right, J_mid = 1, nx - 2, ny // 2
-        # Left source
-        ax[I_left, J_mid], ay[I_left, J_mid], cx[I_left, J_mid], cy[I_left, J_mid] = 0.0, 0.0, 0.0, 0.0
-        b[I_left, J_mid] = 1.0
-        d_rhs[I_left, J_mid] = source_value
-        # Right source
-        ax[I_right, J_mid], ay[I_right, J_mid], cx[I_right, J_mid], cy[I_right, J_mid] = 0.0, 0.0, 0.0, 0.0
-        b[I_right, J_mid] = 1.0
-        d_rhs[I_right, J_mid] = source_value
+        # Left and right sources
+        return [(1, ny // 2), (nx - 2, ny // 2)]
+    return []
+
+def set_sources(nodes, ax, ay, cx, cy, b, inv_b):
+    """Decouple the source nodes so that their value is set by d_rhs alone."""
+    for I, J in nodes:
+        ax[I, J], ay[I, J], cx[I, J], cy[I, J] = 0.0, 0.0, 0.0, 0.0
+        b[I, J], inv_b[I, J] = 1.0, 1.0
+
+def source_value(k, config):
+    """Source signal at time step k."""
+    AA, KK, dt = config['amplitude'], config['frequency_k'], config['dt']
+    return AA * np.sin(np.pi * KK * k * dt)
+
+@jit(nopython=True, parallel=True, fastmath=True, cache=True)
+def compute_rhs(d_rhs, U0, U1, inv_dt2, ax, ay, nx, ny):
+    """Fill the interior of d_rhs from the two previous time layers in one pass."""
+    for i in prange(1, nx - 1):
+        for j in range(1, ny - 1):
+            d_rhs[i, j] = ((-2.0 * U1[i, j] + U0[i, j]) * inv_dt2
+                           - ax * (U0[i - 1, j] - 2.0 * U0[i, j] + U0[i + 1, j])
+                           - ay * (U0[i, j - 1] - 2.0 * U0[i, j] + U0[i, j + 1]))
 
 # --- Main simulation function ---
 
@@ -75,47 +79,120 @@ def run_simulation(config: dict):
     U1[1:nx - 1, 1:ny - 1] = U0[1:nx - 1, 1:ny - 1] + dt * dU[1:nx - 1, 1:ny - 1]
 
     # Base coefficients
-    ax0 = 0.5 * (c ** 2) / (hx ** 2) * np.ones((nx, ny))
-    cx0 = ax0.copy()
-    ay0 = 0.5 * (c ** 2) / (hy ** 2) * np.ones((nx, ny))
-    cy0 = ay0.copy()
-    b0 = ax0 + cx0 + ay0 + cy0 + 1.0 / (dt ** 2)
-
-    # Storage for results
-    U_stack = np.zeros((nx, ny, max_steps), dtype=float)
+    ax_s = 0.5 * (c ** 2) / (hx ** 2)
+    ay_s = 0.5 * (c ** 2) / (hy ** 2)
+    inv_dt2 = 1.0 / (dt ** 2)
+    b_s = ax_s + ax_s + ay_s + ay_s + inv_dt2
+    base = np.array([ax_s, ax_s, ay_s, ay_s, 1.0 / b_s])
+
+    # Relaxation factor: fixed `relax_alfa`, or Chebyshev acceleration if None
+    alfa = config['relax_alfa']
+    rho = jacobi_radius(base, nx, ny) if alfa is None else 0.0
+
+    # Storage for results; only used for plotting, so single precision is enough
+    U_stack = np.empty((nx, ny, max_steps), dtype=np.float32)
+
+    # The system matrix is the same for every step: build it once, with the
+    # source nodes and boundary modifications already applied
+    ax = ax_s * np.ones((nx, ny))
+    cx = ax.copy()
+    ay = ay_s * np.ones((nx, ny))
+    cy = ay.copy()
+    b = ax + cx + ay + cy + 1.0 / (dt ** 2)
+    inv_b = 1.0 / b
+
+    nodes = source_nodes(config)
+    set_sources(nodes, ax, ay, cx, cy, b, inv_b)
+
+    neumann = config['boundary_condition'] == 'neumann'
+    if neumann:
+        apply_neumann_coeff_mods(b, inv_b, ax, ay, cx, cy, nx, ny)
+
+    coeffs = pack_coeffs(ax, ay, cx, cy, b, inv_b=inv_b)
+    method = config['relax_method']
+    if method not in ('sor', 'multigrid', 'cuda', 'aot'):
+        raise ValueError(f"Unknown relax_method: {method}")
+    if method == 'multigrid':
+        levels = build_levels(coeffs)
+        mg_work = multigrid_work(levels)
+    elif method == 'cuda':
+        # Imported on demand so CPU runs never initialise the CUDA driver
+        from numba import cuda
+        from .cuda_solver import extrapolate_cuda, relax_cuda
+        # Device buffers, allocated once: per step only d_rhs goes up and U comes back
+        coeffs = cuda.to_device(coeffs)
+        d_U0, d_U1, d_U = cuda.to_device(U0), cuda.to_device(U1), cuda.to_device(U)
+        d_d_rhs = cuda.device_array((nx, ny))
+        d_dev = cuda.to_device(np.zeros(nx * ny))
+    else:
+        # Only source/boundary nodes differ from `base`
+        row_ptr, ov_j, ov_coeffs = split_overrides(coeffs, base)
+        if method == 'aot':
+            if (nx, ny) != (101, 101):
+                raise ValueError("relax_method 'aot' is only compiled for a 101 x 101 grid")
+            try:
+                from . import relax_mod
+            except ImportError as e:
+                raise ImportError("relax_method 'aot' needs the compiled module relax_mod; "
+                                  "build it with `python -m src.relax_aot` from "
+                                  "lab2-standing-waves") from e
+
+    d_rhs = np.zeros((nx, ny), dtype=float)
 
     print(f"Starting simulation for '{config['experiment_type']}'...")
     for k in tqdm(range(1, max_steps + 1)):
-        ax, ay, cx, cy, b = ax0.copy(), ay0.copy(), cx0.copy(), cy0.copy(), b0.copy()
-
-        d_rhs = np.zeros((nx, ny), dtype=float)
-        d_rhs[1:nx - 1, 1:ny - 1] = (
-            (-2.0 * U1[1:nx - 1, 1:ny - 1] + U0[1:nx - 1, 1:ny - 1]) / (dt ** 2)
-            - 0.5 * (c ** 2) * (
-                (U0[0:nx - 2, 1:ny - 1] - 2.0 * U0[1:nx - 1, 1:ny - 1] + U0[2:nx, 1:ny - 1]) / (hx ** 2)
-                + (U0[1:nx - 1, 0:ny - 2] - 2.0 * U0[1:nx - 1, 1:ny - 1] + U0[1:nx - 1, 2:ny]) / (hy ** 2)
-            )
-        )
-
-        set_sources(k, ax, ay, cx, cy, b, d_rhs, config)
-
-        # Boundary conditions
-        if config['boundary_condition'] == 'neumann':
-            apply_neumann_coeff_mods(b, ax, ay, cx, cy, nx, ny)
-        
+        # Interior is fully rewritten; the boundary of d_rhs stays zero
+        compute_rhs(d_rhs, U0, U1, inv_dt2, ax_s, ay_s, nx, ny)
+        value = source_value(k, config)
+        for I, J in nodes:
+            d_rhs[I, J] = value
+
         # Solve the linear system
-        U = relax(ax, ay, cx, cy, b, d_rhs, nx, ny, U1, 
-                  alfa=config['relax_alfa'], 
-                  eps=config['relax_eps'], 
-                  max_iter=config['relax_max_iter'])
-
-        # Boundary correction
-        if config['boundary_condition'] == 'neumann':
-            copy_neumann_boundaries(U, nx, ny)
-        elif config['boundary_condition'] == 'dirichlet':
+        # Initial guess: linear extrapolation U1 + (U1 - U0) of the last two layers
+        if method == 'cuda':
+            # The device keeps its own copies of the time layers
+            extrapolate_cuda(d_U, d_U0, d_U1)
+        else:
+            np.multiply(U1, 2.0, out=U)
+            U -= U0
+
+        if method == 'multigrid':
+            relax_multigrid(levels, d_rhs, U, eps=config['relax_eps'], neumann=neumann,
+                            work=mg_work)
+        elif method == 'cuda':
+            d_d_rhs.copy_to_device(d_rhs)
+            relax_cuda(coeffs, d_d_rhs, d_U,
+                       alfa=2.0 / (1.0 + np.sqrt(1.0 - rho ** 2)) if alfa is None else alfa,
+                       eps=config['relax_eps'],
+                       max_iter=config['relax_max_iter'],
+                       check_every=config['relax_check_every'],
+                       neumann=neumann,
+                       dev=d_dev)
+            d_U.copy_to_host(U)
+            d_U0, d_U1, d_U = d_U1, d_U, d_U0
+        elif method == 'aot':
+            relax_mod.relax_101x101(base, row_ptr, ov_j, ov_coeffs, d_rhs, U,
+                                    1.0 if alfa is None else alfa,
+                                    config['relax_eps'],
+                                    config['relax_max_iter'],
+                                    config['relax_check_every'],
+                                    rho,
+                                    neumann)
+        elif method == 'sor':
+            relax_uniform(base, row_ptr, ov_j, ov_coeffs, d_rhs, nx, ny, U,
+                          alfa=1.0 if alfa is None else alfa,
+                          eps=config['relax_eps'],
+                          max_iter=config['relax_max_iter'],
+                          check_every=config['relax_check_every'],
+                          rho=rho,
+                          neumann=neumann)
+
+        # Boundary correction (Neumann edges are filled by the solvers)
+        if config['boundary_condition'] == 'dirichlet':
             U[0, :], U[-1, :], U[:, 0], U[:, -1] = 0.0, 0.0, 0.0, 0.0
         
         U_stack[:, :, k - 1] = U
-        U0, U1 = U1.copy(), U.copy()
+        # Rotate the three time layers without copying
+        U0, U1, U = U1, U, U0
 
     return {"U_stack": U_stack, "x": x, "y": y, "config": config}
@@ -13,7 +13,8 @@ def create_2d_animation(simulation_results: dict, output_filename: str, light_k:
     # Frame thinning for smoother playback and smaller file
     U_stack_light = U_stack[..., ::light_k]
 
-    frames = np.transpose(U_stack_light, (2, 1, 0))
+    # One contiguous (n_frames, ny, nx) copy so every frame is a C-order slice
+    frames = np.ascontiguousarray(U_stack_light.transpose(2, 1, 0))
     vmin, vmax = frames.min(), frames.max()
 
     fig, ax = plt.subplots()
@@ -57,22 +58,44 @@ def create_3d_animation(simulation_results: dict, output_filename: str, light_k:
 
     vmin, vmax = U_stack_light.min(), U_stack_light.max()
 
+    # Same mesh density as plot_surface's default rcount=ccount=50: every s-th
+    # node plus the last one. Every frame is drawn on this mesh.
+    rows, cols = X.shape
+    rstride = max(int(np.ceil(rows / 50)), 1)
+    cstride = max(int(np.ceil(cols / 50)), 1)
+    ri = np.r_[0:rows - 1:rstride, rows - 1]
+    ci = np.r_[0:cols - 1:cstride, cols - 1]
+    X, Y = X[np.ix_(ri, ci)], Y[np.ix_(ri, ci)]
+    U_stack_light = U_stack_light[np.ix_(ri, ci)]
+
     fig = plt.figure(figsize=(8, 7))
     ax = fig.add_subplot(111, projection='3d')
     
-    surf = [ax.plot_surface(X, Y, U_stack_light[:, :, 0], cmap='viridis',
-                            linewidth=0, antialiased=False, vmin=vmin, vmax=vmax)]
+    # One quad per mesh cell, created once and updated in place
+    surf = ax.plot_surface(X, Y, U_stack_light[:, :, 0], cmap='viridis', rstride=1, cstride=1,
+                           linewidth=0, antialiased=False, vmin=vmin, vmax=vmax)
     ax.set_zlim(vmin, vmax)
     ax.set_xlabel('x'); ax.set_ylabel('y'); ax.set_zlabel('U')
-    fig.colorbar(surf[0], shrink=0.6, pad=0.1)
+    fig.colorbar(surf, shrink=0.6, pad=0.1)
+
+    # Mesh indices of the four corners of every quad, in drawing order
+    rows, cols = X.shape
+    qi, qj = np.meshgrid(np.arange(rows - 1), np.arange(cols - 1), indexing='ij')
+    qi, qj = qi.ravel(), qj.ravel()
+    corner_i = np.stack((qi, qi, qi + 1, qi + 1), axis=1)
+    corner_j = np.stack((qj, qj + 1, qj + 1, qj), axis=1)
+
+    verts = np.empty(corner_i.shape + (3,))
+    verts[..., 0] = X[corner_i, corner_j]
+    verts[..., 1] = Y[corner_i, corner_j]
 
     def update_3d(i):
-        surf[0].remove()
-        Z = U_stack_light[:, :, i]
-        surf[0] = ax.plot_surface(X, Y, Z, cmap='viridis', linewidth=0,
-                                  antialiased=False, vmin=vmin, vmax=vmax)
+        # Only the heights and face colours change between frames
+        verts[..., 2] = U_stack_light[:, :, i][corner_i, corner_j]
+        surf.set_verts(verts)
+        surf.set_array(verts[..., 2].mean(axis=1))
         ax.set_title(f"3D Animation: {config['experiment_type']} (Step {i*light_k})")
-        return surf
+        return surf,
 
     interval = 1000 * light_k / 30  # Adjust interval based on light_k for ~30 fps
 
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+LAB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = """
+import numpy as np
+from src import build_levels, pack_coeffs, relax, relax_multigrid
+n = 33
+ones = np.ones((n, n))
+coeffs = pack_coeffs(ones, ones, ones, ones, 4.0 * ones + 1.0)
+d_rhs = np.ones((n, n))
+U = np.zeros((n, n))
+"""
+
+STEPS = {
+    "multigrid": "relax_multigrid(build_levels(coeffs), d_rhs, U, eps=1e-8)",
+    "relax": "relax(coeffs, d_rhs, n, n, U, alfa=1.5, eps=1e-8)",
+}
+
+
+def run_step(step, cache_dir):
+    env = dict(os.environ, NUMBA_CACHE_DIR=str(cache_dir))
+    return subprocess.run([sys.executable, "-c", SETUP + STEPS[step]],
+                          cwd=LAB_DIR, env=env, capture_output=True, text=True)
+
+
+def test_relax_loads_from_warm_cache(tmp_path):
+    # The multigrid run caches the parallel sweep, the first `relax` call
+    # compiles and caches `relax`, the second loads it back from the cache
+    for step in ("multigrid", "relax", "relax"):
+        result = run_step(step, tmp_path)
+        assert result.returncode == 0, (step, result.returncode, result.stderr)